@@ -57,3 +57,13 @@ class ToolNotFoundException(LLMException):
                 component="LLM",
             )
         )
+
+
+class RecordingNotFoundException(LLMException):
+    def __init__(self, fingerprint: str, model: str):
+        super().__init__(
+            logging_utils.format_log_msg(
+                msg=f"No recorded response left for request {fingerprint} with model {model}",
+                component="LLM",
+            )
+        )
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import defaultdict
+from enum import StrEnum
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Callable
+
+import litellm
+from litellm.types import utils as litellm_types
+
+from src.llm import exception as llm_exception
+from src.llm.prompt_messages import Message
+from src.logging import utils as logging_utils
+
+
+class RecorderMode(StrEnum):
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+def fingerprint_request(
+    model: str,
+    messages: list[Message],
+    max_tokens: int,
+    tools: list[dict] | None,
+) -> str:
+    payload = {"model": model, "messages": messages, "max_tokens": max_tokens, "tools": tools}
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMRecorder:
+    """
+    Records LLM responses to a gzipped JSON lines archive, or replays them from it.
+    In replay mode the archive is indexed once at startup, keyed by request fingerprint.
+    Identical requests recorded several times are served back in recording order. Once they are used up,
+    further calls fail unless wrap_around is set.
+    An archive supports a single writer at a time; close the recorder (or use it as a context manager)
+    to flush the last compressed block.
+    """
+
+    def __init__(
+        self,
+        archive_path: str | Path,
+        mode: RecorderMode,
+        completion_func: Callable[..., Any] = litellm.completion,
+        simulate_latency: bool = False,
+        wrap_around: bool = False,
+    ):
+        self._logger = logging.getLogger(__name__)
+        self.archive_path = Path(archive_path)
+        self.mode = mode
+        self.completion_func = completion_func
+        self.simulate_latency = simulate_latency
+        self.wrap_around = wrap_around
+        self._lock = threading.Lock()
+        self._index: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self._cursors: dict[str, int] = defaultdict(int)
+        self._archive: IO[str] | None = None
+
+        if self.mode == RecorderMode.REPLAY:
+            self._load_index()
+        else:
+            self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+            self._archive = gzip.open(self.archive_path, "at", encoding="utf-8")
+
+    def __enter__(self) -> LLMRecorder:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+
+    def _load_index(self) -> None:
+        entry_count = 0
+        with gzip.open(self.archive_path, "rt", encoding="utf-8") as archive:
+            try:
+                for line in archive:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    self._index[entry["fingerprint"]].append(entry)
+                    entry_count += 1
+            except (EOFError, OSError, zlib.error, UnicodeDecodeError, json.JSONDecodeError, KeyError) as e:
+                if entry_count == 0:
+                    raise llm_exception.LLMException(
+                        logging_utils.format_log_msg(
+                            msg=f"Archive {self.archive_path} is not a readable recording archive", component="LLM"
+                        )
+                    ) from e
+                self._logger.warning(
+                    f"Archive {self.archive_path} is damaged after {entry_count} entries; ignoring the rest of it."
+                )
+
+    def _record(self, fingerprint: str, model: str, response: litellm_types.ModelResponse, latency: float) -> None:
+        entry = {
+            "fingerprint": fingerprint,
+            "model": model,
+            "latency": latency,
+            "response": response.model_dump(mode="json"),
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._archive is None:
+                raise llm_exception.LLMException(
+                    logging_utils.format_log_msg(msg=f"Recorder for {self.archive_path} is closed", component="LLM")
+                )
+            self._archive.write(line)
+
+    def _replay(self, fingerprint: str, model: str) -> litellm_types.ModelResponse:
+        with self._lock:
+            entries = self._index.get(fingerprint, [])
+            cursor = self._cursors[fingerprint]
+            if not entries or (cursor >= len(entries) and not self.wrap_around):
+                raise llm_exception.RecordingNotFoundException(fingerprint, model)
+            entry = entries[cursor % len(entries)]
+            self._cursors[fingerprint] += 1
+
+        if self.simulate_latency:
+            time.sleep(entry["latency"])
+        return litellm_types.ModelResponse(**entry["response"])
+
+    def completion(
+        self,
+        model: str,
+        messages: list[Message],
+        max_tokens: int,
+        tools: list[dict] | None,
+    ) -> litellm_types.ModelResponse:
+        fingerprint = fingerprint_request(model, messages, max_tokens, tools)
+
+        if self.mode == RecorderMode.REPLAY:
+            return self._replay(fingerprint, model)
+
+        start = time.perf_counter()
+        response = self.completion_func(model=model, messages=messages, max_tokens=max_tokens, tools=tools)
+        latency = time.perf_counter() - start
+        self._record(fingerprint, model, response, latency)
+        return response
@@ -8,6 +8,7 @@ from litellm.types import utils as litellm_types
 
 from src.llm import exception as llm_exception
 from src.llm import models as llm_models
+from src.llm.llm_recorder import LLMRecorder
 from src.llm.llm_tracer import LLMTracer
 from src.llm.prompt_messages import Message, MessageTemplate
 from src.llm.tool_helpers import ToolCall, ToolResult, generate_tool_definition
@@ -27,6 +28,7 @@ class LLMRunner[T]:
         cache_control_index: int | None = None,
         tools: list[Callable] | None = None,
         max_tool_iterations: int = 5,
+        recorder: LLMRecorder | None = None,
     ):
         self._logger = logging.getLogger(__name__)
         self.parse_output = parse_output
@@ -35,6 +37,7 @@ class LLMRunner[T]:
         self.model = model
         self.max_tokens = max_tokens
         self.cache_control_index = cache_control_index
+        self._completion = recorder.completion if recorder is not None else litellm.completion
 
         self.tools = tools or []
         self.max_tool_iterations = max_tool_iterations
@@ -60,12 +63,16 @@ class LLMRunner[T]:
             concrete_prompt[self.cache_control_index]["cache_control"] = {"type": "ephemeral"}
 
         tracer.init_llm_call(censored_concrete_prompt, self.model)
-        response = litellm.completion(
-            model=self.model,
-            messages=concrete_prompt,
-            max_tokens=self.max_tokens,
-            tools=self._tool_definitions,
-        )
+        try:
+            response = self._completion(
+                model=self.model,
+                messages=concrete_prompt,
+                max_tokens=self.max_tokens,
+                tools=self._tool_definitions,
+            )
+        except Exception as e:
+            tracer.fail_llm_call(str(e))
+            raise
         raw_llm_output = str(response.choices[0].message.content)  # type: ignore
         tracer.end_llm_call(raw_llm_output, response.usage)  # type: ignore
         return response.choices[0].message  # type: ignore
@@ -214,5 +221,9 @@ class LLMRunner[T]:
             tracer.end_run(raw_llm_output, error="Failed to parse output.")
             raise
 
+        except llm_exception.RecordingNotFoundException:
+            tracer.end_run(raw_llm_output, error="No recorded response.")
+            raise
+
         except Exception as e:
             raise llm_exception.LLMUnknownException(tracer, query_source, self.model) from e
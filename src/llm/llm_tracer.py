@@ -69,6 +69,10 @@ class LLMTracer:
                 end_time=datetime.now(),
             )
 
+    def fail_llm_call(self, error: str) -> None:
+        if self.llm_generation:
+            self.llm_generation.end(level="ERROR", status_message=error, end_time=datetime.now())
+
     def init_tool_use(self, tool_call: ToolCall) -> None:
         self.tool_use = self.span.span(name=tool_call.name, input=tool_call.arguments, start_time=datetime.now())
 
@@ -0,0 +1,199 @@
+import json
+from unittest import mock
+
+import pytest
+from jinja2 import Template
+from litellm.types import utils as litellm_types
+
+from src.llm import exception as llm_exception
+from src.llm import llm_recorder
+from src.llm import llm_runner as llm_runner_module
+from src.llm.llm_recorder import LLMRecorder, RecorderMode
+from src.llm.llm_runner import LLMRunner
+from src.llm.output_parsers import parse_text
+from src.llm.prompt_censor import do_not_censor_prompt
+from src.llm.prompt_messages import Message, MessageTemplate
+
+MESSAGES: list[Message] = [{"role": "user", "content": "Hello!"}]
+
+
+def get_weather(city: str) -> str:
+    """
+    Get the weather for a given city
+    city: The city to get the weather for
+    """
+    return f"The weather in {city} is sunny."
+
+
+def text_response(content: str) -> litellm_types.ModelResponse:
+    return litellm_types.ModelResponse(
+        model="gpt-4o",
+        choices=[{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        usage={"prompt_tokens": 3, "completion_tokens": 5, "total_tokens": 8},
+    )
+
+
+def tool_call_response(city: str) -> litellm_types.ModelResponse:
+    return litellm_types.ModelResponse(
+        model="gpt-4o",
+        choices=[
+            {
+                "message": {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": "call_1",
+                            "type": "function",
+                            "function": {"name": "get_weather", "arguments": json.dumps({"city": city})},
+                        }
+                    ],
+                },
+                "finish_reason": "tool_calls",
+            }
+        ],
+        usage={"prompt_tokens": 10, "completion_tokens": 7, "total_tokens": 17},
+    )
+
+
+def scripted_completion(*responses: litellm_types.ModelResponse):
+    remaining = list(responses)
+
+    def completion(model: str, messages: list, max_tokens: int, tools: list | None) -> litellm_types.ModelResponse:
+        return remaining.pop(0)
+
+    return completion
+
+
+def no_provider(model: str, messages: list, max_tokens: int, tools: list | None) -> litellm_types.ModelResponse:
+    raise AssertionError("Replay must not call the provider")
+
+
+def record(archive_path, *responses: litellm_types.ModelResponse) -> None:
+    with LLMRecorder(archive_path, RecorderMode.RECORD, completion_func=scripted_completion(*responses)) as recorder:
+        for _ in responses:
+            recorder.completion(model="gpt-4o", messages=MESSAGES, max_tokens=16, tools=None)
+
+
+def replay_content(replayer: LLMRecorder) -> str:
+    response = replayer.completion(model="gpt-4o", messages=MESSAGES, max_tokens=16, tools=None)
+    return response.choices[0].message.content  # type: ignore
+
+
+def test_record_then_replay(tmp_path) -> None:
+    archive_path = tmp_path / "traffic.jsonl.gz"
+    record(archive_path, text_response("Hi there"))
+
+    replayer = LLMRecorder(archive_path, RecorderMode.REPLAY, completion_func=no_provider)
+    replayed = replayer.completion(model="gpt-4o", messages=MESSAGES, max_tokens=16, tools=None)
+
+    assert replayed.choices[0].message.content == "Hi there"  # type: ignore
+    assert replayed.usage.completion_tokens == 5  # type: ignore
+
+
+def test_replay_tool_calls(tmp_path) -> None:
+    archive_path = tmp_path / "traffic.jsonl.gz"
+    original = tool_call_response("Montreal")
+    record(archive_path, original)
+
+    replayer = LLMRecorder(archive_path, RecorderMode.REPLAY, completion_func=no_provider)
+    replayed = replayer.completion(model="gpt-4o", messages=MESSAGES, max_tokens=16, tools=None)
+
+    original_call = original.choices[0].message.tool_calls[0]  # type: ignore
+    replayed_call = replayed.choices[0].message.tool_calls[0]  # type: ignore
+    assert replayed_call.id == original_call.id
+    assert replayed_call.function.name == original_call.function.name == "get_weather"
+    assert replayed_call.function.arguments == original_call.function.arguments
+    assert replayed.usage.prompt_tokens == 10  # type: ignore
+
+
+def test_replay_missing_request(tmp_path) -> None:
+    archive_path = tmp_path / "traffic.jsonl.gz"
+    record(archive_path, text_response("A"))
+
+    unrecorded_messages: list[Message] = [{"role": "user", "content": "B"}]
+
+    replayer = LLMRecorder(archive_path, RecorderMode.REPLAY, completion_func=no_provider)
+    with pytest.raises(llm_exception.RecordingNotFoundException):
+        replayer.completion(model="gpt-4o", messages=unrecorded_messages, max_tokens=16, tools=None)
+
+
+def test_replay_repeated_requests_in_order(tmp_path) -> None:
+    archive_path = tmp_path / "traffic.jsonl.gz"
+    record(archive_path, text_response("first"), text_response("second"))
+
+    replayer = LLMRecorder(archive_path, RecorderMode.REPLAY, completion_func=no_provider)
+    contents = [replay_content(replayer) for _ in range(2)]
+    assert contents == ["first", "second"]
+
+    with pytest.raises(llm_exception.RecordingNotFoundException):
+        replayer.completion(model="gpt-4o", messages=MESSAGES, max_tokens=16, tools=None)
+
+
+def test_replay_wrap_around(tmp_path) -> None:
+    archive_path = tmp_path / "traffic.jsonl.gz"
+    record(archive_path, text_response("first"), text_response("second"))
+
+    replayer = LLMRecorder(archive_path, RecorderMode.REPLAY, completion_func=no_provider, wrap_around=True)
+    contents = [replay_content(replayer) for _ in range(3)]
+    assert contents == ["first", "second", "first"]
+
+
+def test_replay_simulated_latency(tmp_path, monkeypatch) -> None:
+    archive_path = tmp_path / "traffic.jsonl.gz"
+    clock = iter([10.0, 11.5])
+    monkeypatch.setattr(llm_recorder.time, "perf_counter", lambda: next(clock))
+    record(archive_path, text_response("Hi there"))
+
+    sleep = mock.Mock()
+    monkeypatch.setattr(llm_recorder.time, "sleep", sleep)
+    replayer = LLMRecorder(archive_path, RecorderMode.REPLAY, completion_func=no_provider, simulate_latency=True)
+    replayer.completion(model="gpt-4o", messages=MESSAGES, max_tokens=16, tools=None)
+
+    sleep.assert_called_once_with(1.5)
+
+
+def test_replay_damaged_archive(tmp_path) -> None:
+    archive_path = tmp_path / "traffic.jsonl.gz"
+    record(archive_path, text_response("kept"))
+    complete_size = archive_path.stat().st_size
+    record(archive_path, text_response("lost"))
+    with archive_path.open("r+b") as archive:
+        archive.truncate(complete_size + 10)
+
+    replayer = LLMRecorder(archive_path, RecorderMode.REPLAY, completion_func=no_provider)
+    replayed = replayer.completion(model="gpt-4o", messages=MESSAGES, max_tokens=16, tools=None)
+
+    assert replayed.choices[0].message.content == "kept"  # type: ignore
+    with pytest.raises(llm_exception.RecordingNotFoundException):
+        replayer.completion(model="gpt-4o", messages=MESSAGES, max_tokens=16, tools=None)
+
+
+def test_replay_unreadable_archive(tmp_path) -> None:
+    archive_path = tmp_path / "traffic.jsonl"
+    archive_path.write_text('{"fingerprint": "x"}\n')
+
+    with pytest.raises(llm_exception.LLMException, match="not a readable recording archive"):
+        LLMRecorder(archive_path, RecorderMode.REPLAY, completion_func=no_provider)
+
+
+def test_llm_runner_replays_tool_loop_offline(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(llm_runner_module, "LLMTracer", mock.MagicMock())
+    archive_path = tmp_path / "traffic.jsonl.gz"
+    message_template: MessageTemplate = {"role": "user", "content": Template("What is the weather in {{city}}?")}
+    prompt_input = dict(city="Montreal")
+
+    provider = scripted_completion(tool_call_response("Montreal"), text_response("It is sunny in Montreal."))
+    with LLMRecorder(archive_path, RecorderMode.RECORD, completion_func=provider) as recorder:
+        recording_runner = LLMRunner(
+            parse_output=parse_text, prompt_template=[message_template], tools=[get_weather], recorder=recorder
+        )
+        recording_runner.run(prompt_input=prompt_input, query_source="test", censor_func=do_not_censor_prompt)
+
+    replayer = LLMRecorder(archive_path, RecorderMode.REPLAY, completion_func=no_provider)
+    replaying_runner = LLMRunner(
+        parse_output=parse_text, prompt_template=[message_template], tools=[get_weather], recorder=replayer
+    )
+    response = replaying_runner.run(prompt_input=prompt_input, query_source="test", censor_func=do_not_censor_prompt)
+
+    assert response == "It is sunny in Montreal."